@@ -2,23 +2,21 @@
 import sys
 import os
 import json
-import subprocess
+from io import BytesIO
 from pathlib import Path
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout,
     QHBoxLayout, QGridLayout, QPushButton, QLabel, QMessageBox
 )
 from PyQt5.QtGui import QFont
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QObject, QRunnable, QThreadPool, pyqtSignal
 
-from docx import Document
-try:
-    from docx2pdf import convert as docx2pdf_convert
-    DOCX2PDF_AVAILABLE = True
-except Exception:
-    DOCX2PDF_AVAILABLE = False
+# Heavy report dependencies (docx, openpyxl, matplotlib, docx2pdf) are
+# imported lazily inside process_site/export_pdfs_batch so the GUI is
+# interactive immediately instead of waiting on their module loads.
 
 
 BASE_DIR = Path(__file__).parent.resolve()
@@ -44,16 +42,17 @@ def load_sites():
             s["excel"] = f"{s['site']}.xlsx"
     return data
 
-def find_excel_for(site_entry: dict) -> Path | None:
-    """Prefer explicit filename; otherwise try to find by stem or by site name."""
+def build_excel_index() -> dict[str, Path]:
+    """One directory scan mapping lowercase file stems to workbook paths."""
+    return {p.stem.lower(): p for p in BASE_DIR.glob("*.xls*")}
+
+def find_excel_for(site_entry: dict, excel_index: dict[str, Path]) -> Path | None:
+    """Prefer explicit filename; otherwise look up by stem or by site name."""
     explicit = BASE_DIR / site_entry["excel"]
     if explicit.exists():
         return explicit
-    stem = Path(site_entry["excel"]).stem.lower()
-    for p in BASE_DIR.glob("*.xls*"):
-        if p.stem.lower() == stem or p.stem.lower() == site_entry["site"].lower():
-            return p
-    return None
+    return (excel_index.get(Path(site_entry["excel"]).stem.lower())
+            or excel_index.get(site_entry["site"].lower()))
 
 def months_between_inclusive(prev_month: str, curr_month: str) -> list[str]:
     """Calendar walk from prev→curr inclusive, wrapping year if needed."""
@@ -76,6 +75,81 @@ def previous_visit_month(visit_list: list[str], current_month: str) -> str | Non
     except ValueError:
         return None
 
+def process_site(site_entry: dict, picked_month_name: str, year: int,
+                 excel_index: dict[str, Path]) -> Path | None:
+    """Build the summary DOCX (+PDF) for one site. Runs in a worker process."""
+    import matplotlib
+    matplotlib.use("Agg")  # headless; must be set before SGSData imports pyplot
+    import openpyxl
+    from docx import Document
+    from SGSData import run as sgs_run
+    from FlowData import run as flow_run
+
+    excel_path = find_excel_for(site_entry, excel_index)
+    if not excel_path:
+        print(f"[WARN] Excel not found for site '{site_entry['site']}'")
+        return None
+
+    person = (site_entry.get("person") or "Unassigned").strip()
+
+    # Technician + month subfolder: Product/<Tech> - <Month> <Year>/
+    tech_folder_name = f"{person} - {picked_month_name} {year}"
+    TECH_DIR = PRODUCT_DIR / tech_folder_name
+    TECH_DIR.mkdir(parents=True, exist_ok=True)
+
+    # Doc path per site inside that folder
+    out_name = f"Summary - {site_entry['site']} - {picked_month_name} {year}.docx"
+    out_path = TECH_DIR / out_name
+
+    # Seed document — kept live in memory; SGS and Flow append to it directly
+    doc = Document()
+    doc.add_heading(site_entry["site"], level=0)
+    doc.add_paragraph(f"Assigned to: {person}")
+    doc.add_paragraph(f"Reporting Month: {picked_month_name} {year}")
+    doc.add_heading("Results and Discussion", level=1)
+
+    # Determine the month span (previous visit -> selected), inclusive
+    visits = site_entry.get("months", [])
+    prev_visit = previous_visit_month(visits, picked_month_name)
+    if prev_visit:
+        span_months = months_between_inclusive(prev_visit, picked_month_name)
+    else:
+        span_months = [picked_month_name]
+
+    month_numbers = [MONTH_TO_NUM[m] for m in span_months]
+
+    # Load the workbook once and share it between SGSData and FlowData.
+    wb = openpyxl.load_workbook(excel_path, data_only=True, read_only=True)
+
+    # --- SGSData: takes the SAME month window as FlowData ---
+    sgs_run(excel_path, month_numbers, year, out_path, wb=wb, doc=doc)
+
+    # --- FlowData: uses the same month window ---
+    flow_run(excel_path, month_numbers, year, out_path, wb=wb, doc=doc)
+
+    # One serialization per site: to memory, then one atomic write
+    buf = BytesIO()
+    doc.save(buf)
+    out_path.write_bytes(buf.getvalue())
+
+    print(f"✔ Wrote: {out_path}")
+    return out_path
+
+class _TaskSignals(QObject):
+    # QRunnable is not a QObject, so signals live on this helper
+    finished = pyqtSignal()
+
+class PdfExportTask(QRunnable):
+    """Run export_pdfs_batch on a pool thread so the GUI stays responsive."""
+    def __init__(self, docx_paths: list[Path]):
+        super().__init__()
+        self.docx_paths = docx_paths
+        self.signals = _TaskSignals()
+
+    def run(self):
+        export_pdfs_batch(self.docx_paths)
+        self.signals.finished.emit()
+
 class SummaryGUI(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -149,103 +223,105 @@ class SummaryGUI(QMainWindow):
         picked_month_name = NUM_TO_MONTH[self.selected_month]
         year = self.selected_year
 
-        processed_any = False
-
-        for site_entry in sites:
-            visits = site_entry.get("months", [])
-            if picked_month_name not in visits:
-                continue
-
-            excel_path = find_excel_for(site_entry)
-            if not excel_path:
-                print(f"[WARN] Excel not found for site '{site_entry['site']}'")
-                continue
-
-            processed_any = True
-            person = (site_entry.get("person") or "Unassigned").strip()
-
-            # Technician + month subfolder: Product/<Tech> - <Month> <Year>/
-            tech_folder_name = f"{person} - {picked_month_name} {year}"
-            TECH_DIR = PRODUCT_DIR / tech_folder_name
-            TECH_DIR.mkdir(parents=True, exist_ok=True)
-
-            # Doc path per site inside that folder
-            out_name = f"Summary - {site_entry['site']} - {picked_month_name} {year}.docx"
-            out_path = TECH_DIR / out_name
-
-            # Seed document
-            doc = Document()
-            doc.add_heading(site_entry["site"], level=0)
-            doc.add_paragraph(f"Assigned to: {person}")
-            doc.add_paragraph(f"Reporting Month: {picked_month_name} {year}")
-            doc.add_heading("Results and Discussion", level=1)
-            doc.save(out_path)
-
-            # Determine the month span (previous visit -> selected), inclusive
-            prev_visit = previous_visit_month(visits, picked_month_name)
-            if prev_visit:
-                span_months = months_between_inclusive(prev_visit, picked_month_name)
-            else:
-                span_months = [picked_month_name]
-
-            month_numbers = [str(MONTH_TO_NUM[m]) for m in span_months]
-            months_csv = ",".join(month_numbers)
-
-            # --- SGSData: now takes the SAME months_csv window as FlowData ---
-            subprocess.run(
-                [sys.executable, str(BASE_DIR / "SGSData.py"),
-                 str(excel_path), months_csv, str(year), str(out_path)],
-                check=False
-            )
-
-            # --- FlowData: unchanged; uses the same months_csv window ---
-            subprocess.run(
-                [sys.executable, str(BASE_DIR / "FlowData.py"),
-                 str(excel_path), months_csv, str(year), str(out_path)],
-                check=False
-            )
-
-            print(f"✔ Wrote: {out_path}")
-            export_docx_to_pdf(out_path)
-
-
-        if not processed_any:
+        scheduled = [s for s in sites if picked_month_name in s.get("months", [])]
+
+        # Sites are fully independent (own Excel, own output doc), so fan them
+        # out across cores. PDF conversion is batched afterwards so one Word
+        # session handles every file instead of one startup per site.
+        out_paths = []
+        if scheduled:
+            excel_index = build_excel_index()
+            with ProcessPoolExecutor(max_workers=os.cpu_count()) as ex:
+                futures = [ex.submit(process_site, s, picked_month_name, year, excel_index)
+                           for s in scheduled]
+                for f in as_completed(futures):
+                    try:
+                        out_path = f.result()
+                    except Exception as e:
+                        print(f"[WARN] Site processing failed: {e}")
+                        continue
+                    if out_path is not None:
+                        out_paths.append(out_path)
+        if not out_paths:
             QMessageBox.information(self, "Nothing to do",
                                     f"No sites scheduled for {picked_month_name}.")
-        else:
-            QMessageBox.information(
-                self, "Done",
-                "Summaries created in Product/<Technician - Month Year>/"
-            )
-def export_docx_to_pdf(docx_path: Path):
+            return
+
+        # PDF export runs on the global pool; the finished signal delivers the
+        # completion dialog back on the GUI thread, so this returns with the
+        # event loop free for the whole Word conversion.
+        task = PdfExportTask(out_paths)
+        task.signals.finished.connect(self._pdfs_done)
+        QThreadPool.globalInstance().start(task)
+
+    def _pdfs_done(self):
+        QMessageBox.information(
+            self, "Done",
+            "Summaries created in Product/<Technician - Month Year>/"
+        )
+_DOCX2PDF = None  # unprobed; becomes the convert callable or False
+
+def _get_docx2pdf():
+    """Import docx2pdf at first use and memoize the result."""
+    global _DOCX2PDF
+    if _DOCX2PDF is None:
+        try:
+            from docx2pdf import convert
+            _DOCX2PDF = convert
+        except Exception:
+            _DOCX2PDF = False
+    return _DOCX2PDF or None
+
+def export_pdfs_batch(docx_paths: list[Path]):
     """
-    Export a DOCX to a PDF in the same folder. Prefers docx2pdf (Word-based).
-    Falls back to Word COM automation if docx2pdf is unavailable.
+    Export DOCX files to PDFs in their own folders, one Word session per batch.
+    Prefers docx2pdf's directory mode (converts a whole folder per session).
+    Falls back to Word COM automation, reusing one Word instance for all files.
     """
-    pdf_path = docx_path.with_suffix(".pdf")
+    folders = sorted({p.parent for p in docx_paths})
 
-    # Preferred: docx2pdf (fast + robust)
-    if DOCX2PDF_AVAILABLE:
+    # Preferred: docx2pdf on each technician folder (one Word session each)
+    docx2pdf_convert = _get_docx2pdf()
+    if docx2pdf_convert is not None:
         try:
-            docx2pdf_convert(str(docx_path), str(pdf_path))
-            print(f"  → PDF saved: {pdf_path}")
+            for folder in folders:
+                docx2pdf_convert(str(folder))
+                print(f"  → PDFs saved in: {folder}")
             return
         except Exception as e:
             print(f"[WARN] docx2pdf failed: {e}. Trying COM automation…")
 
-    # Fallback: COM automation (Windows + Word required)
+    # Fallback: COM automation (Windows + Word required). COM objects are
+    # apartment-bound and this runs on a QThreadPool worker that may differ
+    # between batches, so Word is scoped to the batch: initialize COM on
+    # this thread, reuse one instance for every file, Quit before leaving.
     try:
+        import pythoncom
         import win32com.client
+    except Exception as e:
+        print(f"[WARN] PDF export failed: {e}. You can still open the DOCX.")
+        return
+    pythoncom.CoInitialize()
+    word = None
+    try:
         word = win32com.client.Dispatch("Word.Application")
         word.Visible = False
-        doc = word.Documents.Open(str(docx_path))
-        # 17 = wdFormatPDF
-        doc.SaveAs(str(pdf_path), FileFormat=17)
-        doc.Close(False)
-        word.Quit()
-        print(f"  → PDF saved: {pdf_path}")
+        for docx_path in docx_paths:
+            pdf_path = docx_path.with_suffix(".pdf")
+            doc = word.Documents.Open(str(docx_path))
+            # 17 = wdFormatPDF
+            doc.SaveAs(str(pdf_path), FileFormat=17)
+            doc.Close(False)
+            print(f"  → PDF saved: {pdf_path}")
     except Exception as e:
         print(f"[WARN] PDF export failed: {e}. You can still open the DOCX.")
+    finally:
+        if word is not None:
+            try:
+                word.Quit()
+            except Exception:
+                pass
+        pythoncom.CoUninitialize()
 
 def main():
     app = QApplication(sys.argv)
@@ -1,18 +1,24 @@
 # FlowData.py
+from __future__ import annotations  # Document is a factory function; keep annotations lazy
+
 import sys
 import re
+import copy
 from pathlib import Path
 from datetime import datetime
 from io import BytesIO
-import matplotlib.pyplot as plt
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from xml.sax.saxutils import escape
 
 from docx import Document
 import openpyxl
-from docx.shared import Cm, Pt, RGBColor
-from docx.oxml import OxmlElement
-from docx.oxml.ns import qn
+from docx.shared import Cm, RGBColor
+from docx.oxml import OxmlElement, parse_xml
+from docx.oxml.ns import qn, nsdecls
+from docx.table import Table
 from docx.text.paragraph import Paragraph
-from docx.enum.table import WD_TABLE_ALIGNMENT
 from collections import defaultdict
 
 # ---------- Helper: insert paragraph after ----------
@@ -32,49 +38,199 @@ PRODUCT_DIR.mkdir(parents=True, exist_ok=True)
 
 LIGHT_BLUE_HEX = "D9EAF7"
 
+# Compiled once per process; these run O(months x sites) times per run
+_PEAK_CAPACITY_RE = re.compile(
+    r'(?:peak rated capacity|peak design daily flow rated capacity of)\s*.*?([\d,]+(?:\.\d+)?)\s*L/day',
+    re.IGNORECASE
+)
+_PUMP_RE = re.compile(r'^pump\s*\d', re.IGNORECASE)
+_HEADING_RE = re.compile(
+    r'flow\s+discharged\s+to\s+(?:the\s+)?subsurface\s+(?:disposal|dispersal)\s+system',
+    re.IGNORECASE
+)
+
+# Chart geometry (px). 960x480 matches the old 8x4 in figure at 120 dpi;
+# the image embeds at 16 cm so there is no point rendering larger.
+CHART_W, CHART_H = 960, 480
+_MARGIN_L, _MARGIN_R, _MARGIN_T, _MARGIN_B = 80, 25, 45, 70
+_LINE_RGB   = (31, 119, 180)   # matplotlib C0
+_EXCEED_RGB = (255, 127, 14)   # matplotlib C1
+_AXIS_RGB   = (0, 0, 0)
+
+def render_flow_chart(days, values, peak, title, xlabel, out_stream,
+                      exceed_points=None):
+    """Render the daily flow line chart straight to PNG with Pillow.
+
+    Replaces matplotlib for this one simple line-plus-markers plot: no
+    figure/canvas construction, no font-cache warm-up, just scaled pixel
+    coordinates and ImageDraw primitives.
+    """
+    font = ImageFont.load_default()
+    img = Image.new("RGB", (CHART_W, CHART_H), (255, 255, 255))
+    draw = ImageDraw.Draw(img)
+
+    x0, x1 = _MARGIN_L, CHART_W - _MARGIN_R
+    y0, y1 = _MARGIN_T, CHART_H - _MARGIN_B
+
+    xmin, xmax = min(days), max(days)
+    if xmin == xmax:
+        xmin, xmax = xmin - 0.5, xmax + 0.5
+    ymax_data = max(values)
+    if peak is not None:
+        ymax_data = max(ymax_data, peak)
+    ymax = ymax_data * 1.05 if ymax_data > 0 else 1.0
+    ymin = 0.0
+
+    def px(x):
+        return x0 + (x - xmin) / (xmax - xmin) * (x1 - x0)
+
+    def py(y):
+        return y1 - (y - ymin) / (ymax - ymin) * (y1 - y0)
+
+    # axes
+    draw.line([(x0, y0), (x0, y1), (x1, y1)], fill=_AXIS_RGB, width=1)
+
+    # x ticks: one per day
+    for d in days:
+        tx = px(d)
+        draw.line([(tx, y1), (tx, y1 + 4)], fill=_AXIS_RGB, width=1)
+        label = str(d)
+        tw = draw.textlength(label, font=font)
+        draw.text((tx - tw / 2, y1 + 7), label, fill=_AXIS_RGB, font=font)
+
+    # y ticks: five even divisions
+    for i in range(6):
+        yv = ymin + (ymax - ymin) * i / 5
+        ty = py(yv)
+        draw.line([(x0 - 4, ty), (x0, ty)], fill=_AXIS_RGB, width=1)
+        label = f"{yv:,.0f}"
+        tw = draw.textlength(label, font=font)
+        draw.text((x0 - 8 - tw, ty - 5), label, fill=_AXIS_RGB, font=font)
+
+    # dashed peak-capacity line
+    if peak is not None and ymin <= peak <= ymax:
+        ty = py(peak)
+        seg, gap, cx = 8, 5, x0
+        while cx < x1:
+            draw.line([(cx, ty), (min(cx + seg, x1), ty)], fill=_LINE_RGB, width=1)
+            cx += seg + gap
+
+    # series line + markers
+    pts = [(px(d), py(v)) for d, v in zip(days, values)]
+    if len(pts) > 1:
+        draw.line(pts, fill=_LINE_RGB, width=2)
+    for cx, cy in pts:
+        draw.ellipse([cx - 3, cy - 3, cx + 3, cy + 3], fill=_LINE_RGB)
+
+    # exceedance markers on top
+    for d, v in (exceed_points or []):
+        cx, cy = px(d), py(v)
+        draw.ellipse([cx - 4, cy - 4, cx + 4, cy + 4], fill=_EXCEED_RGB)
+
+    # title / x label
+    tw = draw.textlength(title, font=font)
+    draw.text(((CHART_W - tw) / 2, 12), title, fill=_AXIS_RGB, font=font)
+    tw = draw.textlength(xlabel, font=font)
+    draw.text(((x0 + x1 - tw) / 2, CHART_H - 35), xlabel, fill=_AXIS_RGB, font=font)
+
+    # rotated y label
+    ylabel = "Flow"
+    tw = int(draw.textlength(ylabel, font=font))
+    lbl = Image.new("RGB", (tw + 4, 14), (255, 255, 255))
+    ImageDraw.Draw(lbl).text((2, 1), ylabel, fill=_AXIS_RGB, font=font)
+    lbl = lbl.transpose(Image.ROTATE_90)
+    img.paste(lbl, (8, int((y0 + y1) / 2 - lbl.height / 2)))
+
+    img.save(out_stream, "PNG", optimize=False, compress_level=1)
+
+_DATE_FMTS = ("%d-%b-%y", "%d-%b-%Y", "%Y-%m-%d", "%b %d, %Y", "%B %d, %Y")
+_LAST_DATE_FMT = [None]
+
+def parse_date_string(s: str) -> datetime | None:
+    """Parse a date string, trying the last format that worked first.
+
+    A sheet almost always uses one format throughout, so the cached format
+    hits on nearly every row and the exception-driven fallback loop only
+    runs when the format actually changes.
+    """
+    fmt0 = _LAST_DATE_FMT[0]
+    if fmt0:
+        try:
+            return datetime.strptime(s, fmt0)
+        except ValueError:
+            pass
+    for fmt in _DATE_FMTS:
+        if fmt == fmt0:
+            continue
+        try:
+            dt = datetime.strptime(s, fmt)
+            _LAST_DATE_FMT[0] = fmt
+            return dt
+        except ValueError:
+            continue
+    return None
+
 def find_latest_docx(product_dir: Path) -> Path:
     docs = [p for p in product_dir.glob("*.docx") if not p.name.startswith("~$")]
     if not docs:
         raise FileNotFoundError(f"No usable .docx files found in {product_dir}")
     return max(docs, key=lambda p: p.stat().st_mtime)
 
-def set_cell_width(cell, width_cm: float):
-    width = Cm(width_cm)
-    tcPr  = cell._tc.get_or_add_tcPr()
-    for w in tcPr.findall(qn('w:tcW')):
-        tcPr.remove(w)
-    tcW = OxmlElement('w:tcW')
-    tcW.set(qn('w:w'), str(width))
-    tcW.set(qn('w:type'), 'dxa')
-    tcPr.append(tcW)
-    cell.width = width
-
-def set_table_column_widths(table):
-    table.allow_autofit = False
-    for i, col in enumerate(table.columns):
-        col_w = 4 if i == 0 else 2.5
-        for cell in col.cells:
-            set_cell_width(cell, col_w)
+_CELL_PPR_XML = ('<w:pPr><w:spacing w:before="0" w:after="0" w:line="240" '
+                 'w:lineRule="auto"/></w:pPr>')
+
+def add_flow_table(doc: Document, cell_texts: list[list[str]]) -> Table:
+    """Emit the whole flow table as one XML string and parse it once.
+
+    One lxml parse replaces thousands of python-docx per-cell calls
+    (cell lookup, add_run, paragraph_format). Column widths live in the
+    <w:tblGrid> with fixed layout: 4 cm for the date column, 2.5 cm for
+    the rest, as before.
+    """
+    n_cols = len(cell_texts[0])
+    widths = [Cm(4 if i == 0 else 2.5).twips for i in range(n_cols)]
+
+    parts = [f'<w:tbl {nsdecls("w")}>']
+    parts.append(
+        '<w:tblPr><w:tblStyle w:val="TableGrid"/>'
+        f'<w:tblW w:w="{sum(widths)}" w:type="dxa"/>'
+        '<w:jc w:val="center"/>'
+        '<w:tblLayout w:type="fixed"/></w:tblPr>'
+    )
+    parts.append('<w:tblGrid>'
+                 + ''.join(f'<w:gridCol w:w="{w}"/>' for w in widths)
+                 + '</w:tblGrid>')
+    for row_texts in cell_texts:
+        cells = ''.join(
+            f'<w:tc><w:p>{_CELL_PPR_XML}<w:r>'
+            f'<w:t xml:space="preserve">{escape(t)}</w:t></w:r></w:p></w:tc>'
+            for t in row_texts
+        )
+        parts.append(f'<w:tr>{cells}</w:tr>')
+    parts.append('</w:tbl>')
+
+    tbl_el = parse_xml(''.join(parts))
+    doc.element.body.append(tbl_el)
+    return Table(tbl_el, doc._body)
+
+def _make_shd(hex_colour: str):
+    shd = OxmlElement('w:shd')
+    shd.set(qn('w:val'),  'clear')
+    shd.set(qn('w:fill'), hex_colour)
+    return shd
+
+_LIGHT_BLUE_SHD = _make_shd(LIGHT_BLUE_HEX)
 
 def shade_row_hex(row, hex_colour: str):
+    # Clone one prebuilt w:shd per cell; spacing is already zeroed at fill
+    # time, so no per-paragraph format pass is needed here.
+    template = _LIGHT_BLUE_SHD if hex_colour == LIGHT_BLUE_HEX else _make_shd(hex_colour)
     for cell in row.cells:
-        tcPr = cell._tc.get_or_add_tcPr()
-        shd  = OxmlElement('w:shd')
-        shd.set(qn('w:val'),  'clear')
-        shd.set(qn('w:fill'), hex_colour)
-        tcPr.append(shd)
-        for p in cell.paragraphs:
-            p.paragraph_format.space_before = Pt(0)
-            p.paragraph_format.space_after  = Pt(0)
-            p.paragraph_format.line_spacing = 1
+        cell._tc.get_or_add_tcPr().append(copy.deepcopy(template))
 
 def extract_peak_capacity(doc: Document) -> float | None:
-    pattern = re.compile(
-        r'(?:peak rated capacity|peak design daily flow rated capacity of)\s*.*?([\d,]+(?:\.\d+)?)\s*L/day',
-        re.IGNORECASE
-    )
     for para in doc.paragraphs:
-        match = pattern.search(para.text)
+        match = _PEAK_CAPACITY_RE.search(para.text)
         if match:
             value_str = match.group(1).replace(',', '')
             try:
@@ -83,78 +239,85 @@ def extract_peak_capacity(doc: Document) -> float | None:
                 continue
     return None
 
-def sheet_to_word_table(ws, title: str, doc, site: str, peak_capacity: float | None = None):
-    # locate Date row and Average row
+def materialize_sheet(ws) -> list[list]:
+    """Read a worksheet once into a rectangular list-of-lists of values.
+
+    Avoids per-cell openpyxl dispatch (and per-call XML parsing on read-only
+    worksheets): every subsequent pass indexes plain Python lists.
+    """
+    data = [list(row) for row in ws.iter_rows(values_only=True)]
+    max_col = max((len(r) for r in data), default=0)
+    for r in data:
+        if len(r) < max_col:
+            r.extend([None] * (max_col - len(r)))
+    return data
+
+def sheet_to_word_table(ws, title: str, doc, site: str, peak_capacity: float | None = None,
+                        insertion_para: Paragraph | None = None):
     from datetime import datetime as _dt
+    data = materialize_sheet(ws)
+    max_row = len(data)
+    max_col = max((len(r) for r in data), default=0)
+
+    # locate Date row and Average row
     date_row = avg_row = None
-    for r in range(1, ws.max_row + 1):
-        first_val = ws.cell(row=r, column=1).value
+    for r in range(1, max_row + 1):
+        first_val = data[r-1][0] if max_col else None
         if isinstance(first_val, str) and first_val.strip().lower() == "date":
             date_row = r
-        row_text = " ".join(
-            str(ws.cell(row=r, column=c).value).lower()
-            for c in range(1, ws.max_column + 1)
-            if ws.cell(row=r, column=c).value is not None
-        )
-        if date_row and "average" in row_text:
-            avg_row = r
-            break
+        if date_row:
+            # Test cell by cell and stop at the first hit, rather than
+            # building one big lowercase string for the whole row.
+            for v in data[r-1]:
+                if v is not None and "average" in str(v).lower():
+                    avg_row = r
+                    break
+            if avg_row:
+                break
     if not date_row or not avg_row or avg_row < date_row:
         print(f"→ Sheet '{ws.title}': missing 'Date' or 'Average' rows.")
         return
 
     rows = range(date_row, avg_row + 1)
-    import re as _re
-    pump_pat = _re.compile(r'^pump\s*\d', _re.IGNORECASE)
-    keep_cols = []
-    for c in range(1, ws.max_column + 1):
-        raw = ws.cell(row=date_row, column=c).value
-        header = str(raw).strip().lower() if raw is not None else ''
-        if 'daily' in header and not header.startswith('total daily flow'):
-            break
-        if pump_pat.search(header):
-            continue
-        if any(ws.cell(row=r_, column=c).value not in (None, "") for r_ in rows):
-            keep_cols.append(c - 1)
+    # Single pass over the materialized grid: find the 'Daily' cutoff, flag
+    # which columns actually carry data, then select in one comprehension.
+    header_lower = [str(v).strip().lower() if v is not None else '' for v in data[date_row-1]]
+    cutoff = next((c for c, h in enumerate(header_lower)
+                   if 'daily' in h and not h.startswith('total daily flow')), max_col)
+    col_has_data = [any(data[r_-1][c] not in (None, "") for r_ in rows)
+                    for c in range(cutoff)]
+    keep_cols = [c for c in range(cutoff)
+                 if col_has_data[c] and not _PUMP_RE.search(header_lower[c])]
     if not keep_cols:
         print(f"→ Sheet '{ws.title}': no data columns before or including 'Daily'.")
         return
 
     doc.add_heading(title, level=2)
-    table = doc.add_table(rows=len(rows), cols=len(keep_cols))
-    table.style     = "Table Grid"
-    table.alignment = WD_TABLE_ALIGNMENT.CENTER
     chart_col_idx = None
 
-    for ridx, r in enumerate(rows):
+    cell_texts = []
+    for r in rows:
+        row_texts = []
         for cidx, col_idx in enumerate(keep_cols):
-            val = ws.cell(row=r, column=col_idx + 1).value
+            val = data[r-1][col_idx]
             text = (
                 val.strftime("%d-%b-%y") if isinstance(val, _dt)
                 else (f"{val:.0f}" if isinstance(val, (float, int)) else (str(val) if val is not None else ""))
             )
-            cell = table.cell(ridx, cidx)
-            cell.text = text
+            row_texts.append(text)
             if r == date_row and isinstance(val, str) and val.strip().lower() == "flow":
                 chart_col_idx = cidx
+        cell_texts.append(row_texts)
 
-    set_table_column_widths(table)
+    table = add_flow_table(doc, cell_texts)
     shade_row_hex(table.rows[0],  LIGHT_BLUE_HEX)
     shade_row_hex(table.rows[-1], LIGHT_BLUE_HEX)
     shade_row_hex(table.rows[-2], LIGHT_BLUE_HEX)
 
-    for row in table.rows:
-        for cell in row.cells:
-            for paragraph in cell.paragraphs:
-                pf = paragraph.paragraph_format
-                pf.space_before = Pt(0)
-                pf.space_after  = Pt(0)
-                pf.line_spacing = 1
-
     # find Flow column
     excel_chart_col = None
     for col_idx in keep_cols:
-        header_val = ws.cell(row=date_row, column=col_idx + 1).value
+        header_val = data[date_row-1][col_idx]
         if isinstance(header_val, str) and header_val.strip().lower() == "flow":
             excel_chart_col = col_idx + 1
             break
@@ -163,30 +326,34 @@ def sheet_to_word_table(ws, title: str, doc, site: str, peak_capacity: float | N
         chart_col_idx = len(keep_cols) - 1
 
     # --- series ---
-    times, values = [], []
-    exceedances = []
+    times, values, ridxs = [], [], []
     for ridx, r in enumerate(rows):
-        date_val = ws.cell(row=r, column=1).value
+        date_val = data[r-1][0]
         dt = None
         if isinstance(date_val, _dt):
             dt = date_val
         elif date_val:
-            for fmt in ("%d-%b-%y", "%d-%b-%Y", "%Y-%m-%d", "%b %d, %Y", "%B %d, %Y"):
-                try:
-                    dt = _dt.strptime(str(date_val), fmt)
-                    break
-                except Exception:
-                    continue
-        val = ws.cell(row=r, column=excel_chart_col).value
+            dt = parse_date_string(str(date_val))
+        val = data[r-1][excel_chart_col-1]
         try:
             fval = float(val)
         except Exception:
             continue
         times.append(dt)
         values.append(fval)
-        if peak_capacity is not None and fval > peak_capacity and chart_col_idx is not None:
-            exceedances.append((dt, fval))
-            cell = table.cell(ridx, chart_col_idx)
+        ridxs.append(ridx)
+
+    # Exceedance detection in one vectorized comparison
+    arr = np.asarray(values, dtype=np.float64)
+    if peak_capacity is not None and arr.size:
+        exceed_mask = arr > peak_capacity
+    else:
+        exceed_mask = np.zeros(arr.shape, dtype=bool)
+    exceed_count = int(exceed_mask.sum())
+    exceedances = [(times[i], values[i]) for i in np.nonzero(exceed_mask)[0]]
+    if chart_col_idx is not None:
+        for i in np.nonzero(exceed_mask)[0]:
+            cell = table.cell(ridxs[i], chart_col_idx)
             for p in cell.paragraphs:
                 for run in p.runs:
                     run.font.color.rgb = RGBColor(0xFF, 0x00, 0x00)
@@ -200,76 +367,50 @@ def sheet_to_word_table(ws, title: str, doc, site: str, peak_capacity: float | N
         values = [v for _, v in pairs]
 
     if values and days:
-        plt.figure(figsize=(8, 4))
-        plt.plot(days, values, marker='o')
-        if peak_capacity is not None:
-            try:
-                plt.hlines(peak_capacity, min(days), max(days), linestyles='--')
-            except ValueError:
-                pass
-            if exceedances:
-                xs = [dt.day for dt, _ in exceedances if isinstance(dt, datetime)]
-                ys = [v for dt, v in exceedances if isinstance(dt, datetime)]
-                if xs and ys:
-                    plt.scatter(xs, ys)
-
         # title: expand month abbrev to full if possible
         month_abbrev = title.split()[0]
         try:
             month_full = datetime.strptime(month_abbrev, '%b').strftime('%B')
         except Exception:
             month_full = month_abbrev
-        plt.title(f"{month_full} flow data of {site}")
-        plt.xticks(days, rotation=45, ha='right')
-        plt.xlabel(f"Day in {month_full}")
-        plt.ylabel("Flow")
-        plt.tight_layout()
+
+        exceed_points = [(dt.day, v) for dt, v in exceedances if isinstance(dt, datetime)]
         img_stream = BytesIO()
-        plt.savefig(img_stream, format="png")
-        plt.close()
+        render_flow_chart(
+            days, values, peak_capacity,
+            f"{month_full} flow data of {site}",
+            f"Day in {month_full}",
+            img_stream,
+            exceed_points=exceed_points,
+        )
         img_stream.seek(0)
         doc.add_paragraph()
         doc.add_picture(img_stream, width=Cm(16))
         img_stream.close()
 
         if peak_capacity is not None and values:
-            exceed_count = len([v for _, v in exceedances])
-            avg_flow = sum(values) / len(values)
+            avg_flow = float(arr.mean())
             avg_classification = "well within" if avg_flow < 0.9 * peak_capacity else ("close to" if avg_flow <= peak_capacity else "above")
             summary_text = (
                 f"{exceed_count} day(s) exceeded the peak rated capacity of {int(peak_capacity):,} L/day. "
                 f"The average daily flow remained {avg_classification} the anticipated range."
             )
-            heading_pat = re.compile(
-                r'flow\s+discharged\s+to\s+(?:the\s+)?subsurface\s+(?:disposal|dispersal)\s+system',
-                re.IGNORECASE
-            )
-            insertion_para = None
-            for para in doc.paragraphs:
-                if heading_pat.fullmatch(para.text.strip()):
-                    insertion_para = para
-                    break
-            if insertion_para:
+            if insertion_para is not None:
                 insert_paragraph_after(insertion_para, summary_text)
             else:
                 doc.add_paragraph(summary_text)
 
-def main():
-    # CLI:
-    # 1) <excel_path>
-    # 2) <months_csv> like "3,4,5"
-    # 3) <year>
-    # 4) [optional] <output_docx_path>
-    if len(sys.argv) < 4:
-        print("Usage: FlowData.py <excel.xlsx> <months_csv> <year> [output.docx]")
-        return
-
-    excel_path = Path(sys.argv[1])
-    months     = [int(x) for x in sys.argv[2].split(",") if x.strip()]
-    year       = int(sys.argv[3])
-    out_docx   = Path(sys.argv[4]) if len(sys.argv) >= 5 else None
-
-    wb = openpyxl.load_workbook(excel_path, data_only=True)
+def run(excel_path: Path, months: list[int], year: int, out_docx: Path | None = None,
+        wb=None, doc: Document | None = None):
+    """Append flow tables/charts for the given months to the summary doc.
+
+    Callable in-process (AutoSummary imports this) or via the CLI in main().
+    An already-loaded workbook can be passed in `wb` to avoid re-parsing the
+    Excel file when SGSData has just read it. A live `doc` can be passed to
+    skip the docx parse/save round-trip; the caller then owns saving it.
+    """
+    if wb is None:
+        wb = openpyxl.load_workbook(excel_path, data_only=True, read_only=True)
     site = excel_path.stem
 
     if out_docx:
@@ -277,8 +418,15 @@ def main():
     else:
         doc_path = find_latest_docx(PRODUCT_DIR)
 
-    doc = Document(doc_path)
+    owns_doc = doc is None
+    if owns_doc:
+        doc = Document(doc_path)
     peak_capacity = extract_peak_capacity(doc)
+    # One scan for the summary-sentence anchor; the paragraph list only grows
+    # as sheets append, so rescanning per sheet would be O(N^2).
+    insertion_para = next(
+        (p for p in doc.paragraphs if _HEADING_RE.fullmatch(p.text.strip())), None
+    )
 
     month_names_full = ["January","February","March","April","May","June",
                         "July","August","September","October","November","December"]
@@ -299,42 +447,64 @@ def main():
         made_chart = False
         before_shapes = len(doc.inline_shapes)
         for sheet_name in matching_sheets:
-            sheet_to_word_table(wb[sheet_name], sheet_name, doc, site, peak_capacity=peak_capacity)
+            sheet_to_word_table(wb[sheet_name], sheet_name, doc, site,
+                                peak_capacity=peak_capacity, insertion_para=insertion_para)
         made_chart = len(doc.inline_shapes) > before_shapes
 
         if not made_chart:
             # Minimal by-index fallback
-            ws = wb[matching_sheets[-1]]
+            data = materialize_sheet(wb[matching_sheets[-1]])
+            max_row = len(data)
+            max_col = max((len(r) for r in data), default=0)
             date_row = None
-            for r in range(1, ws.max_row + 1):
-                if str(ws.cell(row=r, column=1).value).strip().lower() == "date":
+            for r in range(1, max_row + 1):
+                if str(data[r-1][0] if max_col else None).strip().lower() == "date":
                     date_row = r; break
             if date_row:
                 cols = []
-                for c in range(2, ws.max_column + 1):
-                    any_num = any(isinstance(ws.cell(row=rr, column=c).value, (int,float))
-                                  for rr in range(date_row+1, ws.max_row+1))
+                for c in range(2, max_col + 1):
+                    any_num = any(isinstance(data[rr-1][c-1], (int,float))
+                                  for rr in range(date_row+1, max_row+1))
                     if any_num: cols.append(c)
                 if cols:
                     vals = []
-                    for rr in range(date_row+1, ws.max_row+1):
-                        v = ws.cell(row=rr, column=cols[-1]).value
+                    for rr in range(date_row+1, max_row+1):
+                        v = data[rr-1][cols[-1]-1]
                         if isinstance(v, (int,float)): vals.append(v)
                     if vals:
                         img = BytesIO()
-                        plt.figure(figsize=(8,4))
-                        plt.plot(range(1, len(vals)+1), vals, marker='o')
-                        plt.title(f"{month_name} flow data of {site}")
-                        plt.xlabel(f"Day in {month_name}")
-                        plt.ylabel("Flow")
-                        plt.tight_layout()
-                        plt.savefig(img, format="png"); plt.close(); img.seek(0)
+                        render_flow_chart(
+                            list(range(1, len(vals)+1)), vals, None,
+                            f"{month_name} flow data of {site}",
+                            f"Day in {month_name}", img)
+                        img.seek(0)
                         doc.add_paragraph()
                         doc.add_picture(img, width=Cm(16))
                         img.close()
                         
-    doc.save(doc_path)
+    if owns_doc:
+        # Serialize to memory, then one atomic write (fast on network shares)
+        buf = BytesIO()
+        doc.save(buf)
+        doc_path.write_bytes(buf.getvalue())
     print(f"Appended FlowData results into {doc_path.name}")
 
+def main():
+    # CLI:
+    # 1) <excel_path>
+    # 2) <months_csv> like "3,4,5"
+    # 3) <year>
+    # 4) [optional] <output_docx_path>
+    if len(sys.argv) < 4:
+        print("Usage: FlowData.py <excel.xlsx> <months_csv> <year> [output.docx]")
+        return
+
+    excel_path = Path(sys.argv[1])
+    months     = [int(x) for x in sys.argv[2].split(",") if x.strip()]
+    year       = int(sys.argv[3])
+    out_docx   = Path(sys.argv[4]) if len(sys.argv) >= 5 else None
+
+    run(excel_path, months, year, out_docx)
+
 if __name__ == "__main__":
     main()
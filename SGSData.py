@@ -1,7 +1,10 @@
 # SGSData.py — one TABLE + two GRAPHS per sheet (last 6 months)
 # Usage: SGSData.py <excel.xlsx> <months_csv> <year> [output.docx]
 
+from __future__ import annotations  # Document is a factory function; keep annotations lazy
+
 import sys, re
+import functools
 from pathlib import Path
 from datetime import datetime, timedelta, date as ddate, time as dtime
 from io import BytesIO
@@ -9,17 +12,25 @@ from io import BytesIO
 import openpyxl
 from openpyxl.utils.datetime import from_excel as oxl_from_excel, CALENDAR_WINDOWS_1900
 
+from xml.sax.saxutils import escape
+
 from docx import Document
 from docx.shared import Pt, Inches, Cm
-from docx.oxml import OxmlElement
-from docx.oxml.ns import qn
+from docx.oxml import parse_xml
+from docx.table import Table
 from docx.enum.table import WD_ROW_HEIGHT_RULE
+from docx.oxml.ns import nsdecls
 
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")  # no GUI backend; we only rasterize to PNG
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
+from PIL import Image
 
 # -------- appearance tweaks you can tune --------
 GRAPH_WIDTH_IN = 6.7        # fixed graph width for readability on mobile
+CHART_DPI = 150             # well above Word's screen render; 300 was ~9x the pixels
 HEADER_FILL_HEX = "6CA9EF"  # light blue header row
 # Auto-fit row heights: keep these as None (no explicit height set)
 HEADER_ROW_HEIGHT_CM = None
@@ -34,10 +45,28 @@ PRODUCT_DIR = BASE_DIR / "Product"; PRODUCT_DIR.mkdir(parents=True, exist_ok=Tru
 
 # -------- parsing config --------
 DATE_PARSE_FORMATS = ("%d-%b-%Y","%d-%b-%y","%Y-%m-%d","%b %d, %Y","%B %d, %Y","%d/%m/%Y","%m/%d/%Y")
+# Fast path for SGS's dominant dd-Mon-yy(yy) format: build the datetime
+# directly from a regex match, skipping strptime's locale machinery.
+_DMY_RE = re.compile(r"(\d{1,2})-([A-Za-z]{3})-(\d{2,4})$")
+_MONTH_NUM = {m.lower(): i+1 for i, m in enumerate(
+    ("Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"))}
+_LAST_GOOD_FMT = [None]  # last strptime format that matched; tried first
+# Both slash formats accept the same strings, so caching either would let a
+# later ambiguous value bypass the tuple's day-first precedence — never cache.
+_AMBIGUOUS_FMTS = frozenset(("%d/%m/%Y", "%m/%d/%Y"))
+# Header-token normalizer, compiled once (hit per cell in header scans)
+_NORM_RE = re.compile(r"[^a-z0-9]+")
 PARAM_KEYS  = {"cbod","cbod5","tss","tp","tan","tkn","no3","no2","tn","bod","bod5"}
 GROUP1_KEYS = {"cbod5","bod5","tss","cbod","bod"}   # Graph 1
 GROUP2_KEYS = {"tkn","tan","no2","no3","tn"}        # Graph 2
 EXCLUDE_HDR_WORDS = {"units","objective","limit","average","median","cofa","eca"}
+# One C-level alternation scan per token instead of N Python `in` checks
+_PARAM_RE = re.compile("|".join(sorted(PARAM_KEYS,  key=len, reverse=True)))
+_G1_RE    = re.compile("|".join(sorted(GROUP1_KEYS, key=len, reverse=True)))
+_G2_RE    = re.compile("|".join(sorted(GROUP2_KEYS, key=len, reverse=True)))
+# Sheet selection/stop for run(): one alternation scan per sheet name
+_SHEET_PICK_RE = re.compile(r"raw|sewage|biofilter|waternox(?:-ls)?|final effluent|polisher effluent")
+_SHEET_STOP_RE = re.compile(r"final effluent|polisher effluent")
 
 # ---------- helpers for last-6-months window ----------
 def ym_add(year: int, month: int, delta: int) -> tuple[int,int]:
@@ -58,6 +87,21 @@ def find_latest_docx(product_dir: Path) -> Path:
     if not docs: raise FileNotFoundError(f"No .docx files found in {product_dir}")
     return max(docs, key=lambda p: p.stat().st_mtime)
 
+@functools.lru_cache(maxsize=4096)
+def _excel_serial_to_dt(val: float) -> datetime | None:
+    """Convert an Excel date serial to a datetime; memoized for hot scans."""
+    try:
+        converted = oxl_from_excel(val, CALENDAR_WINDOWS_1900)
+    except Exception:
+        try:
+            converted = datetime(1899,12,30) + timedelta(days=val)
+        except Exception:
+            return None
+    if isinstance(converted, dtime): return None
+    if isinstance(converted, ddate) and not isinstance(converted, datetime):
+        return datetime(converted.year, converted.month, converted.day)
+    return converted
+
 def parse_date_cell(val) -> datetime | None:
     if isinstance(val, datetime): return val
     if val is None or (isinstance(val, str) and not val.strip()): return None
@@ -65,80 +109,141 @@ def parse_date_cell(val) -> datetime | None:
         s = val.strip()
         if s.lower() in ("units","average","median","cofa objective","eca objective","cofa limit","eca limit"):
             return None
+        m = _DMY_RE.match(s)
+        if m:
+            mon = _MONTH_NUM.get(m.group(2).lower())
+            if mon:
+                d, y = int(m.group(1)), int(m.group(3))
+                if y < 100:                    # same pivot as strptime's %y
+                    y += 2000 if y < 69 else 1900
+                try: return datetime(y, mon, d)
+                except ValueError: return None
+        fmt0 = _LAST_GOOD_FMT[0]
+        if fmt0:
+            try: return datetime.strptime(s, fmt0)
+            except Exception: pass
         for fmt in DATE_PARSE_FORMATS:
-            try: return datetime.strptime(s, fmt)
+            if fmt == fmt0: continue
+            try:
+                dt = datetime.strptime(s, fmt)
+                if fmt not in _AMBIGUOUS_FMTS:
+                    _LAST_GOOD_FMT[0] = fmt
+                return dt
             except Exception: continue
         return None
     if isinstance(val, (int, float)):
-        try:
-            converted = oxl_from_excel(val, CALENDAR_WINDOWS_1900)
-        except Exception:
-            try:
-                converted = datetime(1899,12,30) + timedelta(days=float(val))
-            except Exception:
-                return None
-        if isinstance(converted, dtime): return None
-        if isinstance(converted, ddate) and not isinstance(converted, datetime):
-            return datetime(converted.year, converted.month, converted.day)
-        return converted
+        # Outside any plausible Excel date serial (1900..~2119): not a date.
+        # Saves the conversion attempt for plain numeric columns scanned by
+        # find_date_column's density pass.
+        if not (1 <= val <= 80000):
+            return None
+        return _excel_serial_to_dt(float(val))
     if isinstance(val, dtime): return None
     if isinstance(val, ddate): return datetime(val.year, val.month, val.day)
     return None
 
-def text(ws, r, c) -> str:
-    v = ws.cell(row=r, column=c).value
+def parse_date_column(grid, date_col: int, start_row: int, max_row: int):
+    """Parse a whole date column in one batched pass.
+
+    Splits the column by cell type: datetimes pass straight through, numeric
+    Excel serials are converted with a single vectorized datetime64
+    expression, and only the (rare) string cells fall back to per-cell
+    parse_date_cell. Returns parallel (dates, row_idxs) lists in row order
+    with non-date rows dropped.
+    """
+    col = [grid[r-1][date_col-1] for r in range(start_row, max_row+1)]
+    parsed: list = [None] * len(col)
+    num_pos, num_vals = [], []
+    for i, v in enumerate(col):
+        if isinstance(v, datetime):
+            parsed[i] = v
+        elif isinstance(v, bool):
+            continue
+        elif isinstance(v, (int, float)):
+            if 1 <= v <= 80000:       # plausible Excel serial range (1900..~2119)
+                num_pos.append(i); num_vals.append(v)
+        elif v is not None:
+            parsed[i] = parse_date_cell(v)
+    if num_vals:
+        serials = np.asarray(num_vals, dtype="float64")
+        dt64 = np.datetime64("1899-12-30") + (serials * 86400.0).astype("timedelta64[s]")
+        for i, dt in zip(num_pos, dt64.tolist()):
+            parsed[i] = dt
+    dates, row_idxs = [], []
+    for i, dt in enumerate(parsed):
+        if dt is not None:
+            dates.append(dt); row_idxs.append(start_row + i)
+    return dates, row_idxs
+
+def materialize_sheet(ws) -> list[list]:
+    """Read a worksheet once into a rectangular list-of-lists of values.
+
+    Random ws.cell access on a read-only worksheet re-parses XML per call;
+    after this single iter_rows pass everything indexes plain Python lists.
+    """
+    grid = [list(row) for row in ws.iter_rows(values_only=True)]
+    max_col = max((len(r) for r in grid), default=0)
+    for r in grid:
+        if len(r) < max_col:
+            r.extend([None] * (max_col - len(r)))
+    return grid
+
+def text(grid, r, c) -> str:
+    v = grid[r-1][c-1]
     return ("" if v is None else str(v)).strip()
 
-def shade_cell(cell, fill_hex: str):
-    tcPr = cell._tc.get_or_add_tcPr()
-    shd = tcPr.find(qn('w:shd'))
-    if shd is None:
-        shd = OxmlElement('w:shd')
-        tcPr.append(shd)
-    shd.set(qn('w:val'), 'clear')
-    shd.set(qn('w:color'), 'auto')
-    shd.set(qn('w:fill'), fill_hex)  # hex WITHOUT leading '#'
-
-def _set_table_cell_margins(table, top=None, start=None, bottom=None, end=None):
-    """Apply table-level cell padding (margins) in DXA units."""
-    tblPr = table._tblPr
-    mar = tblPr.find(qn('w:tblCellMar'))
-    if mar is None:
-        mar = OxmlElement('w:tblCellMar')
-        tblPr.append(mar)
-    for side, val in (('top', top), ('start', start), ('bottom', bottom), ('end', end)):
-        if val is None:
-            continue
-        el = mar.find(qn(f'w:{side}'))
-        if el is None:
-            el = OxmlElement(f'w:{side}')
-            mar.append(el)
-        el.set(qn('w:w'), str(val))
-        el.set(qn('w:type'), 'dxa')
+_CELL_PPR_XML = '<w:pPr><w:spacing w:before="0" w:after="0"/></w:pPr>'
 
 def add_word_table(doc: Document, headers, rows):
-    t = doc.add_table(rows=len(rows)+1, cols=len(headers))
-    t.style = "Table Grid"
-    t.autofit = False  # ensure our explicit width sticks
-
-    # Header row
-    for j, h in enumerate(headers):
-        cell = t.cell(0, j)
-        cell.text = h
-        shade_cell(cell, HEADER_FILL_HEX)
-
-    # Body rows
-    for i, row in enumerate(rows, start=1):
-        for j, v in enumerate(row):
-            t.cell(i, j).text = "" if v is None else str(v)
-
-    # Tighten paragraph spacing for all cells
-    for row_obj in t.rows:
-        for cell in row_obj.cells:
-            for p in cell.paragraphs:
-                pf = p.paragraph_format
-                pf.space_before = Pt(0)
-                pf.space_after  = Pt(0)
+    """Emit the whole table as one XML string and parse it once.
+
+    One lxml parse replaces thousands of python-docx per-cell calls (cell
+    lookup, add_run, paragraph_format, shading). Everything the old
+    builder set — Table Grid style, fixed layout, header shading, cell
+    padding, tight spacing, wide Date column — is expressed inline.
+    """
+    n_cols = len(headers)
+    date_col_idx = next(
+        (j for j, h in enumerate(headers) if "date" in str(h).strip().lower()), None
+    )
+    date_w = Inches(DATE_COL_WIDTH_IN).twips
+    body_w = 2160  # 1.5" per parameter column, matching the old add_table grid
+    widths = [date_w if j == date_col_idx else body_w for j in range(n_cols)]
+    pad = TABLE_CELL_PADDING_DXA
+
+    def tc(value, j, fill=None):
+        props = []
+        if j == date_col_idx:
+            props.append(f'<w:tcW w:w="{date_w}" w:type="dxa"/>')
+        if fill:
+            props.append(f'<w:shd w:val="clear" w:color="auto" w:fill="{fill}"/>')
+        tcPr = f'<w:tcPr>{"".join(props)}</w:tcPr>' if props else ''
+        t = escape("" if value is None else str(value))
+        return (f'<w:tc>{tcPr}<w:p>{_CELL_PPR_XML}<w:r>'
+                f'<w:t xml:space="preserve">{t}</w:t></w:r></w:p></w:tc>')
+
+    parts = [f'<w:tbl {nsdecls("w")}>']
+    parts.append(
+        '<w:tblPr><w:tblStyle w:val="TableGrid"/>'
+        f'<w:tblW w:w="{sum(widths)}" w:type="dxa"/>'
+        '<w:tblLayout w:type="fixed"/>'
+        '<w:tblCellMar>'
+        f'<w:top w:w="{pad}" w:type="dxa"/><w:start w:w="{pad}" w:type="dxa"/>'
+        f'<w:bottom w:w="{pad}" w:type="dxa"/><w:end w:w="{pad}" w:type="dxa"/>'
+        '</w:tblCellMar></w:tblPr>'
+    )
+    parts.append('<w:tblGrid>'
+                 + ''.join(f'<w:gridCol w:w="{w}"/>' for w in widths)
+                 + '</w:tblGrid>')
+    parts.append('<w:tr>' + ''.join(tc(h, j, fill=HEADER_FILL_HEX)
+                                    for j, h in enumerate(headers)) + '</w:tr>')
+    for row in rows:
+        parts.append('<w:tr>' + ''.join(tc(v, j) for j, v in enumerate(row)) + '</w:tr>')
+    parts.append('</w:tbl>')
+
+    tbl_el = parse_xml(''.join(parts))
+    doc.element.body.append(tbl_el)
+    t = Table(tbl_el, doc._body)
 
     # ---- Row heights (auto-fit when constants are None) ----
     if HEADER_ROW_HEIGHT_CM is not None:
@@ -149,65 +254,73 @@ def add_word_table(doc: Document, headers, rows):
             t.rows[ri].height = Cm(BODY_ROW_HEIGHT_CM)
             t.rows[ri].height_rule = WD_ROW_HEIGHT_RULE.AT_LEAST
 
-    # --- ONLY widen the column whose header contains "Date" ---
-    date_col_idx = None
-    for j, h in enumerate(headers):
-        if "date" in str(h).strip().lower():
-            date_col_idx = j
-            break
-    if date_col_idx is not None:
-        for cell in t.columns[date_col_idx].cells:
-            cell.width = Inches(DATE_COL_WIDTH_IN)
-
-    # Fixed layout prevents Word from re-autofitting widths
-    tblPr = t._tblPr
-    tblLayout = OxmlElement('w:tblLayout')
-    tblLayout.set(qn('w:type'), 'fixed')
-    tblPr.append(tblLayout)
-
-    # Trim inner cell padding to reduce bulk
-    _set_table_cell_margins(
-        t,
-        top=TABLE_CELL_PADDING_DXA,
-        start=TABLE_CELL_PADDING_DXA,
-        bottom=TABLE_CELL_PADDING_DXA,
-        end=TABLE_CELL_PADDING_DXA
-    )
-
     return t
 
 # -------- find header/Date --------
-def find_param_header_row(ws) -> int | None:
-    max_r = min(ws.max_row, 80); max_c = min(ws.max_column, 80)
+def find_param_header_row(grid) -> int | None:
+    max_c_all = len(grid[0]) if grid else 0
+    max_r = min(len(grid), 80); max_c = min(max_c_all, 80)
     for r in range(1, max_r+1):
         hits = 0
         for c in range(1, max_c+1):
-            s = text(ws, r, c).lower()
+            s = text(grid, r, c).lower()
             if not s: continue
-            tok = re.sub(r"[^a-z0-9]+", "", s)
-            if any(key in tok for key in PARAM_KEYS):
+            tok = _NORM_RE.sub("", s)
+            if _PARAM_RE.search(tok):
                 hits += 1
         if hits >= 2:
             return r
     return None
 
-def find_date_column(ws) -> int | None:
-    max_r = min(ws.max_row, 60); max_c = min(ws.max_column, 60)
+def find_date_column(grid) -> int | None:
+    max_c_all = len(grid[0]) if grid else 0
+    max_r = min(len(grid), 60); max_c = min(max_c_all, 60)
     # Prefer a header named "Date"
     for r in range(1, max_r+1):
         for c in range(1, max_c+1):
-            if "date" in text(ws, r, c).lower():
+            if "date" in text(grid, r, c).lower():
                 return c
     # Fallback: best column by "looks like a date" density
     best_col, best_score = None, -1
-    N = min(ws.max_row, 40)
+    N = min(len(grid), 40)
     for c in range(1, max_c+1):
-        score = sum(1 for r in range(1, N+1) if parse_date_cell(ws.cell(row=r, column=c).value))
+        # Cheap rejection: the first non-empty value must at least look
+        # numeric/datetime/date-string before we pay for a full parse scan.
+        first = next((grid[r-1][c-1] for r in range(1, N+1)
+                      if grid[r-1][c-1] not in (None, "")), None)
+        if first is None:
+            continue
+        if not isinstance(first, (int, float, datetime)) and parse_date_cell(first) is None:
+            continue
+        score = 0
+        for r in range(1, N+1):
+            if parse_date_cell(grid[r-1][c-1]):
+                score += 1
+        if score == N:
+            # Every scanned cell parses — no later column can score higher,
+            # and ties go to the first column anyway
+            return c
         if score > best_score:
             best_score, best_col = score, c
     return best_col
 
 # -------- plotting (absolute, fixed size) --------
+# One Figure/Axes reused for every graph: figure construction and teardown
+# at dpi=300 (canvas alloc, font-cache warm-up) dwarf the actual plotting,
+# so clear the axes between graphs instead.
+_FIG, _AX = plt.subplots(figsize=(11, 6), dpi=CHART_DPI)
+# Fixed margins tuned once for this figsize (room for 45-degree xticks);
+# cheaper and deterministic vs. tight_layout's iterative solver per graph.
+_FIG.subplots_adjust(left=0.08, right=0.98, top=0.9, bottom=0.22)
+
+# The tick formatter is stateless, so one instance serves every chart; the
+# locator keeps per-axes state and stays freshly constructed per call.
+_DATE_FMT = mdates.DateFormatter('%d-%b-%y')
+
+# One reusable PNG buffer for every chart; seek(0)/truncate() per use keeps
+# the multi-MB allocation alive instead of churning a fresh BytesIO per call.
+_IMG_BUF = BytesIO()
+
 def plot_series_to_doc(doc: Document, title: str, series: dict[str, list[tuple[datetime,float]]]):
     if not series:
         return
@@ -220,50 +333,54 @@ def plot_series_to_doc(doc: Document, title: str, series: dict[str, list[tuple[d
     if not clean:
         return
 
-    plt.figure(figsize=(11, 6), dpi=300)
-    any_pts = False
+    _AX.clear()
     for label, pts in clean.items():
-        xs = [dt for dt,_ in pts]; ys = [v for _,v in pts]
-        if xs and ys:
-            any_pts = True
-            plt.plot(xs, ys, marker='o', linewidth=2.6, markersize=6, label=label)
-    if not any_pts:
-        plt.close(); return
-
-    ax = plt.gca()
-    ax.xaxis.set_major_formatter(mdates.DateFormatter('%d-%b-%y'))
-    ax.xaxis.set_major_locator(mdates.AutoDateLocator())
-    plt.xticks(rotation=45, ha='right', fontsize=12)
-    plt.yticks(fontsize=12)
-    plt.ylabel("Concentration (mg/L)", fontsize=13)
-    plt.title(title, fontsize=16)
-    plt.legend(fontsize=12)
-    plt.tight_layout()
-
-    img = BytesIO(); plt.savefig(img, format="png", dpi=300); plt.close(); img.seek(0)
+        # pts is non-empty by construction; numpy arrays go into Line2D as
+        # one C-level copy instead of per-point list conversion
+        xs_t, ys_t = zip(*pts)
+        xs = np.array(xs_t, dtype="datetime64[s]")
+        ys = np.asarray(ys_t, dtype=np.float64)
+        _AX.plot(xs, ys, marker='o', linewidth=2.6, markersize=6, label=label)
+
+    _AX.xaxis.set_major_formatter(_DATE_FMT)
+    _AX.xaxis.set_major_locator(mdates.AutoDateLocator())
+    plt.setp(_AX.get_xticklabels(), rotation=45, ha='right', fontsize=12)
+    plt.setp(_AX.get_yticklabels(), fontsize=12)
+    _AX.set_ylabel("Concentration (mg/L)", fontsize=13)
+    _AX.set_title(title, fontsize=16)
+    _AX.legend(fontsize=12)
+
+    # Rasterize once on the reused Agg canvas and PNG-encode with Pillow at
+    # zlib level 1: skips savefig's per-call backend dispatch and metadata
+    # path, and the embedded chart isn't size-critical.
+    _FIG.canvas.draw()
+    pil = Image.frombuffer("RGBA", _FIG.canvas.get_width_height(),
+                           _FIG.canvas.buffer_rgba(), "raw", "RGBA", 0, 1)
+    _IMG_BUF.seek(0); _IMG_BUF.truncate()
+    pil.save(_IMG_BUF, format="PNG", optimize=False, compress_level=1)
+    _IMG_BUF.seek(0)
     doc.add_paragraph()
-    doc.add_picture(img, width=Inches(GRAPH_WIDTH_IN))
-    img.close()
+    doc.add_picture(_IMG_BUF, width=Inches(GRAPH_WIDTH_IN))
 
 # -------- per-sheet workflow (one table + two graphs over last 6 months) --------
-def table_then_two_graphs(doc: Document, ws, sheet_name: str, months_csv: str, year: int, need_pagebreak: bool) -> bool:
-    param_row = find_param_header_row(ws); date_col = find_date_column(ws)
+def table_then_two_graphs(doc: Document, grid, sheet_name: str, months_csv: str, year: int, need_pagebreak: bool) -> bool:
+    max_row = len(grid)
+    max_col = len(grid[0]) if grid else 0
+    param_row = find_param_header_row(grid); date_col = find_date_column(grid)
     if not param_row or not date_col:
         return False
 
     # Data begins after the param row; skip meta rows like Units/ECA/CofA
     start_row = param_row + 1
     for _ in range(2):
-        row_text = " ".join(text(ws, start_row, c).lower() for c in range(1, ws.max_column+1))
+        if start_row > max_row:   # header/meta rows may end the sheet
+            return False
+        row_text = " ".join(text(grid, start_row, c).lower() for c in range(1, max_col+1))
         if any(k in row_text for k in ("units","cofa","eca","objective","limit")):
             start_row += 1
 
-    # Collect all dates + row indices
-    dates, row_idxs = [], []
-    for r in range(start_row, ws.max_row+1):
-        dt = parse_date_cell(ws.cell(row=r, column=date_col).value)
-        if dt:
-            dates.append(dt); row_idxs.append(r)
+    # Collect all dates + row indices (batched column parse)
+    dates, row_idxs = parse_date_column(grid, date_col, start_row, max_row)
     if not dates:
         return False
 
@@ -280,29 +397,37 @@ def table_then_two_graphs(doc: Document, ws, sheet_name: str, months_csv: str, y
     start_dt = month_start(start_y, start_m)
     end_dt   = month_end(sel_year, sel_month)
 
-    idxs = [i for i, d in enumerate(dates) if start_dt <= d <= end_dt]
+    # Window mask as one vectorized comparison over the whole date column
+    dates_arr = np.array(dates, dtype="datetime64[s]")
+    in_window = (dates_arr >= np.datetime64(start_dt)) & (dates_arr <= np.datetime64(end_dt))
+    idxs = np.nonzero(in_window)[0].tolist()
     if not idxs:
         return False
 
+    # Windowed rows, sliced once; has_num, the table build and both series
+    # all read from this instead of re-indexing the full grid ~3x.
+    win_rows  = [grid[row_idxs[i]-1] for i in idxs]
+    win_dates = [dates[i] for i in idxs]
+
     # Select parameter columns & groups (only those with any numeric data in the 6-month window)
     group1_cols, group1_labels, group2_cols, group2_labels = [], [], [], []
     all_cols, all_labels = [], []
-    for c in range(1, ws.max_column+1):
+    for c in range(1, max_col+1):
         if c == date_col:
             continue
-        raw = text(ws, param_row, c)
+        raw = text(grid, param_row, c)
         if not raw:
             continue
-        norm = re.sub(r"[^a-z0-9]+", "", raw.lower())
+        norm = _NORM_RE.sub("", raw.lower())
         if not norm or norm == "date" or any(w in norm for w in EXCLUDE_HDR_WORDS):
             continue
 
-        in_g1 = any(k in norm for k in GROUP1_KEYS)
-        in_g2 = any(k in norm for k in GROUP2_KEYS)
+        in_g1 = bool(_G1_RE.search(norm))
+        in_g2 = bool(_G2_RE.search(norm))
         if not (in_g1 or in_g2):
             continue
 
-        has_num = any(isinstance(ws.cell(row=row_idxs[i], column=c).value, (int,float)) for i in idxs)
+        has_num = any(isinstance(wr[c-1], (int,float)) for wr in win_rows)
         if not has_num:
             continue
 
@@ -320,66 +445,59 @@ def table_then_two_graphs(doc: Document, ws, sheet_name: str, months_csv: str, y
     trimmed = sheet_name.split(" ", 1)[1] if " " in sheet_name else sheet_name
     doc.add_heading(trimmed, level=2)
 
-    # TABLE over the full 6-month window
+    # TABLE + both graph series in ONE pass over the windowed rows: each
+    # float parse feeds the table cell and, via group membership, the series
+    # for graph 1/2 — instead of touching every cell up to three times.
     headers = ["Date"] + all_labels
+    g1, g2 = set(group1_cols), set(group2_cols)
+    series1 = {label: [] for label in group1_labels}
+    series2 = {label: [] for label in group2_labels}
     rows = []
-    for i in idxs:
-        r = row_idxs[i]; dt = dates[i]
+    for wr, dt in zip(win_rows, win_dates):
         row = [dt.strftime("%d-%b-%y")]
-        for c in all_cols:
-            v = ws.cell(row=r, column=c).value
+        for c, label in zip(all_cols, all_labels):
+            v = wr[c-1]
             try:
-                row.append(f"{float(v):g}")
+                fv = float(v)
             except Exception:
                 row.append("" if v is None else str(v))
+                continue
+            row.append(f"{fv:g}")
+            if c in g1: series1[label].append((dt, fv))
+            if c in g2: series2[label].append((dt, fv))
         rows.append(row)
 
     add_word_table(doc, headers, rows)
     doc.add_paragraph()
 
     # GRAPH 1: cBOD/BOD/TSS — last 6 months
-    if group1_cols:
-        series1 = {}
-        for label, c in zip(group1_labels, group1_cols):
-            pts = []
-            for i in idxs:
-                r = row_idxs[i]; v = ws.cell(row=r, column=c).value
-                try:
-                    pts.append((dates[i], float(v)))
-                except Exception:
-                    continue
-            if pts:
-                series1[label] = pts
-        if series1:
-            plot_series_to_doc(doc, f"{trimmed} — cBOD/BOD/TSS (Last 6 Months)", series1)
+    series1 = {label: pts for label, pts in series1.items() if pts}
+    if series1:
+        plot_series_to_doc(doc, f"{trimmed} — cBOD/BOD/TSS (Last 6 Months)", series1)
 
     # GRAPH 2: Nitrogen species — last 6 months
-    if group2_cols:
-        series2 = {}
-        for label, c in zip(group2_labels, group2_cols):
-            pts = []
-            for i in idxs:
-                r = row_idxs[i]; v = ws.cell(row=r, column=c).value
-                try:
-                    pts.append((dates[i], float(v)))
-                except Exception:
-                    continue
-            if pts:
-                series2[label] = pts
-        if series2:
-            plot_series_to_doc(doc, f"{trimmed} — Nitrogen Species (Last 6 Months)", series2)
+    series2 = {label: pts for label, pts in series2.items() if pts}
+    if series2:
+        plot_series_to_doc(doc, f"{trimmed} — Nitrogen Species (Last 6 Months)", series2)
 
     return True
 
-def main():
-    if len(sys.argv) < 4:
-        print("Usage: SGSData.py <excel.xlsx> <months_csv> <year> [output.docx]"); return
-    excel_path = Path(sys.argv[1]); months_csv = sys.argv[2]; year = int(sys.argv[3])
-    out_docx = Path(sys.argv[4]) if len(sys.argv) >= 5 else None
-
-    wb = openpyxl.load_workbook(excel_path, data_only=True)
+def run(excel_path: Path, months: list[int], year: int, out_docx: Path | None = None,
+        wb=None, doc: Document | None = None):
+    """Append SGS tables/graphs for the given months to the summary doc.
+
+    Callable in-process (AutoSummary imports this) or via the CLI in main().
+    An already-loaded workbook can be passed in `wb` so AutoSummary can share
+    one load between SGSData and FlowData. A live `doc` can be passed to skip
+    the docx parse/save round-trip; the caller then owns saving it.
+    """
+    months_csv = ",".join(str(m) for m in months)
+    if wb is None:
+        wb = openpyxl.load_workbook(excel_path, data_only=True, read_only=True)
     doc_path = out_docx if out_docx else find_latest_docx(PRODUCT_DIR)
-    doc = Document(doc_path)
+    owns_doc = doc is None
+    if owns_doc:
+        doc = Document(doc_path)
 
     # Remove top margin across sections (for tighter fit)
     for section in doc.sections:
@@ -389,25 +507,38 @@ def main():
     doc.add_page_break()
     doc.add_heading("Appendix A: SGS Tables & Graphs", level=1)
 
-    any_done = False
-    first_section = True
+    # Pre-filter sheet names once: a single regex scan per name, lowercased
+    # once, and the list itself ends at the terminal final/polisher sheet
+    # (matches the original break-after semantics).
+    targets = []
     for sheet_name in wb.sheetnames:
         lname = sheet_name.lower()
-        process = (any(k in lname for k in ["raw","sewage","biofilter","waternox","waternox-ls"])
-                   or ("final effluent" in lname or "polisher effluent" in lname))
-        if not process:
+        if not _SHEET_PICK_RE.search(lname):
             continue
+        targets.append(sheet_name)
+        if _SHEET_STOP_RE.search(lname):
+            break
 
-        if table_then_two_graphs(doc, wb[sheet_name], sheet_name, months_csv, year, need_pagebreak=not first_section):
+    any_done = False
+    first_section = True
+    for sheet_name in targets:
+        grid = materialize_sheet(wb[sheet_name])
+        if table_then_two_graphs(doc, grid, sheet_name, months_csv, year, need_pagebreak=not first_section):
             any_done = True
             first_section = False
 
-        # Stop after final/polisher (matches original flow)
-        if "final effluent" in lname or "polisher effluent" in lname:
-            break
-
-    doc.save(doc_path)
+    if owns_doc:
+        doc.save(doc_path)
     print(f"{'Appended' if any_done else 'No'} SGS tables & graphs {'into' if any_done else ''} {doc_path.name if any_done else ''}".strip())
 
+def main():
+    if len(sys.argv) < 4:
+        print("Usage: SGSData.py <excel.xlsx> <months_csv> <year> [output.docx]"); return
+    excel_path = Path(sys.argv[1])
+    months = [int(x) for x in sys.argv[2].split(",") if x.strip()]
+    year = int(sys.argv[3])
+    out_docx = Path(sys.argv[4]) if len(sys.argv) >= 5 else None
+    run(excel_path, months, year, out_docx)
+
 if __name__ == "__main__":
     main()